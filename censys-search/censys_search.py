@@ -7,6 +7,7 @@ censys_ip_lookup.py (Censys Platform SDK / global_data.get_host)
 - New SDK: censys_platform
 - Lookup: sdk.global_data.get_host(host_id=<ip>)
 - Output: human-readable print (NO table, NO raw JSON dump, NO huge http bodies)
+  or, with --json, the same summary as one line of compact JSON
 
 Auth:
   - env: CENSYS_PAT
@@ -19,38 +20,55 @@ Install:
   pip install censys-platform
 
 Usage:
+  python censys_search.py 8.8.8.8
+  cat ips.txt | python censys_search.py --batch
+  cat ips.txt | python censys_search.py --batch --json   # JSON Lines
+
   export CENSYS_PAT="..."
   export CENSYS_ORG_ID="..."   # optional
-  python censys_ip_lookup.py --ip 8.8.8.8
-  python censys_ip_lookup.py --ip 8.8.8.8 --include_threats
-  python censys_ip_lookup.py --ip 8.8.8.8 --max-dns 30
 """
 
 from __future__ import annotations
 
 import argparse
-import ipaddress
+import functools
+import inspect
 import json
 import os
+import re
+import socket
 import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from censys_platform import SDK, RetryConfig
-from censys_platform.utils import BackoffStrategy
+# censys_platform is imported inside main(): the generated SDK is large and
+# --help / invalid-IP exits should not pay for it
 
 
 # ----------------------------
 # config / secrets
 # ----------------------------
 
-def _read_json_file(p: Path) -> Optional[Dict[str, Any]]:
+@functools.lru_cache(maxsize=8)
+def _read_json_cached(path: str, mtime: float) -> Optional[Dict[str, Any]]:
+    # keyed on mtime so an edited file is re-read
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return json.loads(Path(path).read_text(encoding="utf-8"))
     except Exception:
         return None
 
 
+def _read_json_file(p: Path) -> Optional[Dict[str, Any]]:
+    try:
+        mtime = p.stat().st_mtime
+    except OSError:
+        return None
+    return _read_json_cached(str(p), mtime)
+
+
 def load_censys_config() -> Tuple[str, Optional[str]]:
     """
     Returns: (pat, organization_id)
@@ -106,9 +124,16 @@ def validate_ip(value: str) -> str:
     v = value.strip()
     if not v:
         raise ValueError("empty_ip")
+    # inet_pton is a single C call and, unlike inet_aton, only accepts
+    # canonical dotted-quad IPv4 (no "127.1" / hex / octal forms)
+    try:
+        socket.inet_pton(socket.AF_INET, v)
+        return v
+    except (OSError, ValueError):
+        pass
     try:
-        ipaddress.ip_address(v)
-    except ValueError:
+        socket.inet_pton(socket.AF_INET6, v)
+    except (OSError, ValueError):
         raise ValueError("invalid_ip")
     return v
 
@@ -117,8 +142,20 @@ def validate_ip(value: str) -> str:
 # SDK response helpers
 # ----------------------------
 
+# type -> "is the SDK's Unset sentinel"; the class-name check runs once per type
+_UNSET_TYPES: Dict[type, bool] = {}
+
+_MISSING = object()
+
+
 def _is_unset(v: Any) -> bool:
-    return v is None or v.__class__.__name__.lower() == "unset"
+    if v is None:
+        return True
+    t = type(v)
+    unset = _UNSET_TYPES.get(t)
+    if unset is None:
+        unset = _UNSET_TYPES[t] = t.__name__.lower() == "unset"
+    return unset
 
 
 def _safe_get(obj: Any, *path: str, default: Any = None) -> Any:
@@ -129,13 +166,73 @@ def _safe_get(obj: Any, *path: str, default: Any = None) -> Any:
         if isinstance(cur, dict):
             cur = cur.get(p, default)
             continue
-        if hasattr(cur, p):
-            cur = getattr(cur, p)
-            continue
-        return default
+        cur = getattr(cur, p, _MISSING)
+        if cur is _MISSING:
+            return default
     return default if _is_unset(cur) else cur
 
 
+def _as_port(v: Any) -> Optional[int]:
+    # int or numeric string in one C-level parse; anything else -> None
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def _sorted_ports(values: List[Any]) -> List[int]:
+    """
+    Deduplicated, ascending port numbers via a 65536-bit bitmap (no hash
+    set, no sort). Reading it back only visits non-zero bytes, located by
+    a C-level regex scan over the 8 KiB buffer.
+    """
+    bits = bytearray(8192)
+    for v in values:
+        p = _as_port(v)
+        if p is not None and 0 <= p <= 0xFFFF:
+            bits[p >> 3] |= 1 << (p & 7)
+
+    out: List[int] = []
+    for m in _NONZERO_BYTE.finditer(bits):
+        i = m.start()
+        b = bits[i]
+        base = i << 3
+        for bit in range(8):
+            if b >> bit & 1:
+                out.append(base | bit)
+    return out
+
+
+def _dict_field(obj: Dict[str, Any], name: str) -> Any:
+    v = obj.get(name)
+    return None if v is None or _is_unset(v) else v
+
+
+def _attr_field(obj: Any, name: str) -> Any:
+    v = getattr(obj, name, None)
+    return None if v is None or _is_unset(v) else v
+
+
+def _field_getter(sample: Any) -> Callable[[Any, str], Any]:
+    """
+    Single-level field accessor for a list of SDK entries, specialised on
+    the type of its first element. Entries of any other type (a dict among
+    models, a None, ...) go through the generic _safe_get.
+    """
+    fast = _dict_field if isinstance(sample, dict) else _attr_field
+    sample_type = type(sample)
+
+    def get(obj: Any, name: str) -> Any:
+        if type(obj) is sample_type:
+            return fast(obj, name)
+        return _safe_get(obj, name)
+
+    return get
+
+
 def unwrap_host_resource(envelope: Any) -> Any:
     """
     sdk.global_data.get_host(host_id=ip) returns something like:
@@ -161,6 +258,10 @@ def unwrap_host_resource(envelope: Any) -> Any:
 # summarization (JSON object in memory)
 # ----------------------------
 
+# column-oriented rows: one list per field, zip(*cols) yields the rows
+SoftwareCols = namedtuple("SoftwareCols", "port protocol vendor product version cpe")
+ThreatCols = namedtuple("ThreatCols", "port protocol name type")
+
 def summarize_host(host: Any, include_threats: bool = False, max_dns: int = 50) -> Dict[str, Any]:
     # ---- DNS ----
     dns = _safe_get(host, "dns", default=None)
@@ -199,74 +300,68 @@ def summarize_host(host: Any, include_threats: bool = False, max_dns: int = 50)
     }
 
     # ---- Routing ----
+    asys = _safe_get(host, "autonomous_system", default=None)
     routing = {
-        "asn": _safe_get(host, "autonomous_system", "asn"),
-        "bgp_prefix": _safe_get(host, "autonomous_system", "bgp_prefix"),
-        "country_code": _safe_get(host, "autonomous_system", "country_code"),
-        "as_name": _safe_get(host, "autonomous_system", "name"),
-        "as_description": _safe_get(host, "autonomous_system", "description"),
+        "asn": _safe_get(asys, "asn"),
+        "bgp_prefix": _safe_get(asys, "bgp_prefix"),
+        "country_code": _safe_get(asys, "country_code"),
+        "as_name": _safe_get(asys, "name"),
+        "as_description": _safe_get(asys, "description"),
     }
 
     # ---- Services ----
-    services_obj = _safe_get(host, "services", default=[]) or []
-    service_count = _safe_get(host, "service_count")
+    sg = _safe_get
+    services_obj = sg(host, "services", default=[]) or []
+    service_count = sg(host, "service_count")
 
-    ports: Set[int] = set()
-    protocols: Set[str] = set()
+    svc_ports = [sg(s, "port") for s in services_obj]
+    svc_protos = [sg(s, "protocol") for s in services_obj]
 
-    software_rows: List[Dict[str, Optional[str]]] = []
-    threat_rows: List[Dict[str, Optional[str]]] = []
+    protocols: Set[str] = {p for p in svc_protos if isinstance(p, str) and p}
 
-    for svc in services_obj:
-        port = _safe_get(svc, "port")
-        proto = _safe_get(svc, "protocol")
+    software = SoftwareCols([], [], [], [], [], [])
+    threats = ThreatCols([], [], [], [])
+    sw_port, sw_proto, sw_vendor, sw_product, sw_version, sw_cpe = software
+    th_port, th_proto, th_name, th_type = threats
 
-        if isinstance(port, int):
-            ports.add(port)
-        elif isinstance(port, str) and port.isdigit():
-            ports.add(int(port))
-
-        if isinstance(proto, str) and proto:
-            protocols.add(proto)
+    for svc, port, proto in zip(services_obj, svc_ports, svc_protos):
+        port_s = str(port) if port is not None else None
+        proto_s = str(proto) if proto is not None else None
 
         # software
-        sw_list = _safe_get(svc, "software", default=[]) or []
+        sw_list = sg(svc, "software", default=[]) or []
+        if sw_list:
+            get = _field_getter(sw_list[0])
         for sw in sw_list:
-            vendor = _safe_get(sw, "vendor")
-            product = _safe_get(sw, "product")
-            version = _safe_get(sw, "version")
-            cpe = _safe_get(sw, "cpe")
+            vendor = get(sw, "vendor")
+            product = get(sw, "product")
+            version = get(sw, "version")
+            cpe = get(sw, "cpe")
 
-            if not any([vendor, product, version, cpe]):
+            if not (vendor or product or version or cpe):
                 continue
 
-            software_rows.append(
-                {
-                    "port": str(port) if port is not None else None,
-                    "protocol": str(proto) if proto is not None else None,
-                    "vendor": vendor,
-                    "product": product,
-                    "version": version,
-                    "cpe": cpe,
-                }
-            )
+            sw_port.append(port_s)
+            sw_proto.append(proto_s)
+            sw_vendor.append(vendor)
+            sw_product.append(product)
+            sw_version.append(version)
+            sw_cpe.append(cpe)
 
         # threats (optional)
         if include_threats:
-            thr_list = _safe_get(svc, "threats", default=[]) or []
+            thr_list = sg(svc, "threats", default=[]) or []
+            if thr_list:
+                get = _field_getter(thr_list[0])
             for thr in thr_list:
-                name = _safe_get(thr, "name")
-                ttype = _safe_get(thr, "type")
-                if not any([name, ttype]):
+                name = get(thr, "name")
+                ttype = get(thr, "type")
+                if not (name or ttype):
                     continue
-                threat_rows.append(
-                    {
-                        "port": str(port) if port is not None else None,
-                        "protocol": str(proto) if proto is not None else None,
-                        "name": name,
-                        "type": ttype,
-                    }
-                )
+                th_port.append(port_s)
+                th_proto.append(proto_s)
+                th_name.append(name)
+                th_type.append(ttype)
 
     summary: Dict[str, Any] = {
         "ip": _safe_get(host, "ip"),
@@ -284,14 +379,14 @@ def summarize_host(host: Any, include_threats: bool = False, max_dns: int = 50)
         },
         "services": {
             "service_count": service_count,
-            "ports": sorted(ports),
+            "ports": _sorted_ports(svc_ports),
             "protocols": sorted(protocols),
-            "software": software_rows,
+            "software": software,
         },
     }
 
     if include_threats:
-        summary["services"]["threats"] = threat_rows
+        summary["services"]["threats"] = threats
 
     return summary
 
@@ -300,144 +395,274 @@ def summarize_host(host: Any, include_threats: bool = False, max_dns: int = 50)
 # human-readable print (no JSON dump)
 # ----------------------------
 
-def _print_kv(key: str, value: Any, indent: int = 0) -> None:
+def _print_kv(out: List[str], key: str, value: Any, indent: int = 0) -> None:
     pad = " " * indent
     if value is None or value == "" or value == [] or value == {}:
         return
-    print(f"{pad}{key}: {value}")
+    out.append(f"{pad}{key}: {value}")
 
 
 def print_summary(summary: Dict[str, Any], max_list_items: int = 30) -> None:
     """
     Print readable summary without dumping raw JSON.
-    Caps long lists.
+    Caps long lists. Lines are collected and written to stdout in one call.
     """
+    out: List[str] = []
     ip = summary.get("ip")
-    print(f"[Censys Platform] Host Summary")
-    print(f"IP: {ip}")
+    out.append(f"[Censys Platform] Host Summary")
+    out.append(f"IP: {ip}")
 
     routing = summary.get("routing", {}) or {}
-    print("\n== Routing ==")
-    _print_kv("ASN", routing.get("asn"), 0)
-    _print_kv("BGP Prefix", routing.get("bgp_prefix"), 0)
-    _print_kv("AS Name", routing.get("as_name"), 0)
-    _print_kv("AS Desc", routing.get("as_description"), 0)
+    out.append("\n== Routing ==")
+    _print_kv(out, "ASN", routing.get("asn"), 0)
+    _print_kv(out, "BGP Prefix", routing.get("bgp_prefix"), 0)
+    _print_kv(out, "AS Name", routing.get("as_name"), 0)
+    _print_kv(out, "AS Desc", routing.get("as_description"), 0)
 
     loc = summary.get("location", {}) or {}
-    print("\n== Location ==")
-    _print_kv("Continent", loc.get("continent"), 0)
-    _print_kv("Country", f"{loc.get('country')} ({loc.get('country_code')})" if loc.get("country") else loc.get("country_code"), 0)
-    _print_kv("Province", loc.get("province"), 0)
-    _print_kv("City", loc.get("city"), 0)
-    _print_kv("Timezone", loc.get("timezone"), 0)
+    out.append("\n== Location ==")
+    _print_kv(out, "Continent", loc.get("continent"), 0)
+    _print_kv(out, "Country", f"{loc.get('country')} ({loc.get('country_code')})" if loc.get("country") else loc.get("country_code"), 0)
+    _print_kv(out, "Province", loc.get("province"), 0)
+    _print_kv(out, "City", loc.get("city"), 0)
+    _print_kv(out, "Timezone", loc.get("timezone"), 0)
     if loc.get("latitude") is not None and loc.get("longitude") is not None:
-        _print_kv("Coordinates", f"{loc.get('latitude')}, {loc.get('longitude')}", 0)
+        _print_kv(out, "Coordinates", f"{loc.get('latitude')}, {loc.get('longitude')}", 0)
 
     dns = summary.get("dns", {}) or {}
     counts = dns.get("counts", {}) or {}
-    print("\n== DNS ==")
-    _print_kv("Forward DNS count", counts.get("forward_dns"), 0)
-    _print_kv("Reverse DNS count", counts.get("reverse_dns"), 0)
-    _print_kv("DNS names count", counts.get("names"), 0)
+    out.append("\n== DNS ==")
+    _print_kv(out, "Forward DNS count", counts.get("forward_dns"), 0)
+    _print_kv(out, "Reverse DNS count", counts.get("reverse_dns"), 0)
+    _print_kv(out, "DNS names count", counts.get("names"), 0)
 
     def _print_list(title: str, items: List[str]):
         if not items:
             return
         show = items[:max_list_items]
         more = len(items) - len(show)
-        print(f"\n{title} (showing {len(show)}{' +'+str(more) if more>0 else ''}):")
+        out.append(f"\n{title} (showing {len(show)}{' +'+str(more) if more>0 else ''}):")
         for x in show:
-            print(f" - {x}")
+            out.append(f" - {x}")
 
     _print_list("Forward DNS (top)", dns.get("forward_dns_top") or [])
     _print_list("Reverse DNS (top)", dns.get("reverse_dns_top") or [])
     _print_list("DNS names (top)", dns.get("names_top") or [])
 
     svc = summary.get("services", {}) or {}
-    print("\n== Services ==")
-    _print_kv("Service count", svc.get("service_count"), 0)
-    _print_kv("Ports", svc.get("ports"), 0)
-    _print_kv("Protocols", svc.get("protocols"), 0)
-
-    software = svc.get("software") or []
-    if software:
-        print(f"\nSoftware (rows: {len(software)}; showing up to {max_list_items}):")
-        for row in software[:max_list_items]:
-            port = row.get("port") or "?"
-            proto = row.get("protocol") or "?"
-            vendor = row.get("vendor") or "N/A"
-            product = row.get("product") or "N/A"
-            version = row.get("version") or "N/A"
-            cpe = row.get("cpe") or "N/A"
-            print(f" - {port}/{proto}  {vendor}  {product}  ver={version}  cpe={cpe}")
-        if len(software) > max_list_items:
-            print(f" ... ({len(software) - max_list_items} more)")
-
-    threats = svc.get("threats") or []
-    if threats:
-        print(f"\nThreats (rows: {len(threats)}; showing up to {max_list_items}):")
-        for row in threats[:max_list_items]:
-            port = row.get("port") or "?"
-            proto = row.get("protocol") or "?"
-            name = row.get("name") or "N/A"
-            ttype = row.get("type") or "N/A"
-            print(f" - {port}/{proto}  {name}  type={ttype}")
-        if len(threats) > max_list_items:
-            print(f" ... ({len(threats) - max_list_items} more)")
+    out.append("\n== Services ==")
+    _print_kv(out, "Service count", svc.get("service_count"), 0)
+    _print_kv(out, "Ports", svc.get("ports"), 0)
+    _print_kv(out, "Protocols", svc.get("protocols"), 0)
+
+    software = svc.get("software")
+    n_software = len(software.port) if software else 0
+    if n_software:
+        out.append(f"\nSoftware (rows: {n_software}; showing up to {max_list_items}):")
+        for port, proto, vendor, product, version, cpe in islice(zip(*software), max_list_items):
+            out.append(
+                f" - {port or '?'}/{proto or '?'}  {vendor or 'N/A'}  {product or 'N/A'}"
+                f"  ver={version or 'N/A'}  cpe={cpe or 'N/A'}"
+            )
+        if n_software > max_list_items:
+            out.append(f" ... ({n_software - max_list_items} more)")
+
+    threats = svc.get("threats")
+    n_threats = len(threats.port) if threats else 0
+    if n_threats:
+        out.append(f"\nThreats (rows: {n_threats}; showing up to {max_list_items}):")
+        for port, proto, name, ttype in islice(zip(*threats), max_list_items):
+            out.append(f" - {port or '?'}/{proto or '?'}  {name or 'N/A'}  type={ttype or 'N/A'}")
+        if n_threats > max_list_items:
+            out.append(f" ... ({n_threats - max_list_items} more)")
+
+    sys.stdout.write("\n".join(out) + "\n")
+
+
+def print_summary_json(summary: Dict[str, Any]) -> None:
+    """
+    Write the summary as one line of compact JSON (for pipes/automation);
+    skips all the per-field formatting of print_summary.
+    """
+    services = dict(summary.get("services") or {})
+    for k in ("software", "threats"):
+        cols = services.get(k)
+        if cols is not None:
+            services[k] = [dict(zip(cols._fields, row)) for row in zip(*cols)]
+    doc = dict(summary, services=services)
+    sys.stdout.write(json.dumps(doc, default=str, ensure_ascii=False, separators=(",", ":")) + "\n")
 
 
 # ----------------------------
 # CLI
 # ----------------------------
 
-def load_config():
+@functools.lru_cache(maxsize=1)
+def _load_api_config() -> Dict[str, Any]:
     file_path = "/home/ubuntu/.openclaw/api_config.json"
     with open(file_path, "r", encoding="utf-8") as f:
-        config = json.load(f)
+        return json.load(f)
+
+
+def load_config():
+    config = _load_api_config()
     return config.get("api_token", {}).get("censys-search", {}).get("pat", "")
 
-def main() -> int:
-    if len(sys.argv) == 1:
-        print("Usage: censys_search.py <ip_address>", file=sys.stderr)
-        return
-    ip_address = sys.argv[1]
+CENSYS_API_URL = "https://api.platform.censys.io"
+
+
+def _batch_http_client(workers: int) -> Any:
+    """
+    httpx client for --batch: keep-alive pool sized to the worker count,
+    and HTTP/2 (all workers multiplexed on one connection) when the h2
+    package is installed.
+    """
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=workers, max_keepalive_connections=workers),
+    )
+
+
+def _warm_up(http_client: Any) -> None:
+    # DNS + TCP + TLS before the first lookup; an unauthenticated HEAD
+    # costs no query credits. Failures are left to the real requests.
+    try:
+        http_client.head(CENSYS_API_URL, timeout=10)
+    except Exception:
+        pass
+
 
+def lookup_host(sdk: Any, ip_address: str) -> Dict[str, Any]:
+    res = sdk.global_data.get_host(host_id=ip_address)
+    host = unwrap_host_resource(res)
+    return summarize_host(host)
+
+
+def read_batch(stream: Any) -> List[str]:
+    """One IP per line; blank lines and '#' comments are skipped."""
+    out: List[str] = []
+    for line in stream:
+        v = line.strip()
+        if v and not v.startswith("#"):
+            out.append(v)
+    return out
+
+
+def _lookup_one(sdk: Any, raw: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Returns (target, summary, error); never raises so batch workers keep going."""
     try:
-        ip_address = validate_ip(ip_address)
+        ip_address = validate_ip(raw)
     except ValueError as e:
-        print(f"error: {e}", file=sys.stderr)
+        return raw, None, str(e)
+    try:
+        return ip_address, lookup_host(sdk, ip_address), None
+    except Exception as e:
+        return ip_address, None, f"censys_platform_lookup_failed: {e}"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Censys Platform host lookup")
+    ap.add_argument("ip", nargs="?", help="target IP address (IPv4/IPv6)")
+    ap.add_argument("--batch", action="store_true",
+                    help="read IP addresses from stdin (one per line) and reuse one SDK client")
+    ap.add_argument("--workers", type=int, default=16,
+                    help="concurrent lookups in --batch mode (default: 16)")
+    ap.add_argument("--json", action="store_true",
+                    help="print the summary as compact JSON (one line per host)")
+    args = ap.parse_args()
+
+    batch = args.batch
+    if args.ip is None and not batch:
+        print("Usage: censys_search.py <ip_address>", file=sys.stderr)
         return 2
 
+    if batch:
+        targets = read_batch(sys.stdin)
+    else:
+        try:
+            targets = [validate_ip(args.ip)]
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+
     try:
         pat = load_config()
     except RuntimeError as e:
         print(f"error: {e}", file=sys.stderr)
         return 2
 
+    from censys_platform import SDK, RetryConfig
+    from censys_platform.utils import BackoffStrategy
+
     retry_cfg = RetryConfig(
         "backoff",
         BackoffStrategy(100, 10000, 1.5, 30000),
         True
     )
 
-    try:
-        sdk_kwargs: Dict[str, Any] = {
-            "personal_access_token": pat,
-            "retry_config": retry_cfg,
-        }
-
-        with SDK(**sdk_kwargs) as sdk:
-            res = sdk.global_data.get_host(host_id=ip_address)
-            host = unwrap_host_resource(res)
-            summary = summarize_host(host)
-
-        print_summary(summary)
-        return 0
+    sdk_kwargs: Dict[str, Any] = {
+        "personal_access_token": pat,
+        "retry_config": retry_cfg,
+    }
 
+    if not batch:
+        try:
+            with SDK(**sdk_kwargs) as sdk:
+                summary = lookup_host(sdk, targets[0])
+
+            if args.json:
+                print_summary_json(summary)
+            else:
+                print_summary(summary)
+            return 0
+
+        except Exception as e:
+            print(f"error: censys_platform_lookup_failed: {e}", file=sys.stderr)
+            return 1
+
+    # batch: one SDK context (HTTP connection pool, retry config) shared by
+    # the worker threads; results are printed in input order
+    workers = max(1, args.workers)
+    http_client = None
+    if "client" in inspect.signature(SDK).parameters:
+        http_client = _batch_http_client(workers)
+        _warm_up(http_client)
+        sdk_kwargs["client"] = http_client
+
+    failed = 0
+    shown = 0
+    try:
+        with SDK(**sdk_kwargs) as sdk, ThreadPoolExecutor(max_workers=workers) as pool:
+            for target, summary, err in pool.map(lambda raw: _lookup_one(sdk, raw), targets):
+                if err is not None:
+                    print(f"error: {target}: {err}", file=sys.stderr)
+                    failed += 1
+                    continue
+                if args.json:
+                    print_summary_json(summary)
+                    continue
+                if shown:
+                    print()
+                print_summary(summary)
+                shown += 1
     except Exception as e:
         print(f"error: censys_platform_lookup_failed: {e}", file=sys.stderr)
         return 1
+    finally:
+        # a caller-supplied client is not closed by the SDK
+        if http_client is not None:
+            http_client.close()
+
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
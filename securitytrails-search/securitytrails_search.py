@@ -4,35 +4,128 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
 import re
+import string
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from pysecuritytrails import SecurityTrails, SecurityTrailsError
+from typing import Any, Dict, List, Optional, Tuple
 
 
 DOMAIN_RE = re.compile(
     r"^(?=.{1,253}\.?$)(?:(?!-)[A-Za-z0-9-]{1,63}(?<!-)\.)+[A-Za-z]{2,63}\.?$"
 )
 
+# bytes allowed anywhere in a lowercased name; deleted by bytes.translate
+_NAME_BYTES = (string.ascii_lowercase + string.digits + "-.").encode("ascii")
 
-def load_config():
+# DOMAIN_RE without lookarounds (Hyperscan does not support them) for
+# lowercased input; the 253-char limit is checked separately.
+_HS_DOMAIN_PATTERN = rb"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$"
+
+
+@functools.lru_cache(maxsize=1)
+def _load_api_config() -> Dict[str, Any]:
     file_path = "/home/ubuntu/.openclaw/api_config.json"
     with open(file_path, "r", encoding="utf-8") as f:
-        config = json.load(f)
+        return json.load(f)
+
+
+def load_config():
+    config = _load_api_config()
     return config.get("api_token", {}).get("securitytrails-search", {}).get("api_key", "")
 
 
+def _is_valid_domain(d: str) -> bool:
+    """
+    Same rules as DOMAIN_RE for a lowercased ASCII name, checked label by
+    label in a single pass (no backtracking).
+    """
+    if len(d) > 253:
+        return False
+    # charset of the whole name in one C-level pass
+    if d.encode("ascii").translate(None, _NAME_BYTES):
+        return False
+    labels = d.split(".")
+    if len(labels) < 2:
+        return False
+    for label in labels:
+        if not 1 <= len(label) <= 63 or label[0] == "-" or label[-1] == "-":
+            return False
+    tld = labels[-1]
+    return len(tld) >= 2 and tld.isalpha()
+
+
 def validate_domain(domain: str) -> str:
     d = domain.strip().rstrip(".")
     if not d:
         raise ValueError("empty_domain")
-    if not DOMAIN_RE.fullmatch(d):
+    d = d.lower()
+    if d.isascii():
+        ok = _is_valid_domain(d)
+    else:
+        # IDN: the idna codec does not enforce the hyphen rule and the
+        # xn-- form always passes it, so check the Unicode labels first
+        if any(label.startswith("-") or label.endswith("-") for label in d.split(".")):
+            raise ValueError("invalid_domain")
+        # then validate the punycode form
+        try:
+            d = d.encode("idna").decode("ascii")
+        except UnicodeError:
+            raise ValueError("invalid_domain")
+        ok = DOMAIN_RE.fullmatch(d) is not None
+    if not ok:
         raise ValueError("invalid_domain")
-    return d.lower()
+    return d
+
+
+@functools.lru_cache(maxsize=1)
+def _hyperscan_db() -> Any:
+    """Compiled Hyperscan database, or None when hyperscan is not installed."""
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[_HS_DOMAIN_PATTERN],
+        ids=[0],
+        elements=1,
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH],
+    )
+    return db
+
+
+def _on_hs_match(id_: int, start: int, end: int, flags: int, context: List[bool]) -> None:
+    context.append(True)
+
+
+def validate_domain_batch(domains: List[str]) -> List[Optional[str]]:
+    """
+    validate_domain() for many names at once; None marks an invalid entry.
+    ASCII names are matched by a Hyperscan DFA when the optional hyperscan
+    package is installed, otherwise by the pure-Python label check.
+    """
+    db = _hyperscan_db()
+    out: List[Optional[str]] = []
+    for raw in domains:
+        d = raw.strip().rstrip(".").lower()
+        if db is None or not d.isascii():
+            try:
+                out.append(validate_domain(raw))
+            except ValueError:
+                out.append(None)
+            continue
+        if not d or len(d) > 253:
+            out.append(None)
+            continue
+        hit: List[bool] = []
+        db.scan(d.encode("ascii"), match_event_handler=_on_hs_match, context=hit)
+        out.append(d if hit else None)
+    return out
 
 
 def print_title(s: str) -> None:
@@ -40,68 +133,45 @@ def print_title(s: str) -> None:
     print("-" * 80)
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="SecurityTrails domain lookup via pysecuritytrails")
-    ap.add_argument("domain", help="target domain (e.g., example.com)")
-    ap.add_argument("--mode", choices=["info", "subdomains", "whois", "history_dns", "history_whois", "tags"], default="info")
-    ap.add_argument("--limit", type=int, default=50, help="max list items to print (default: 50)")
-    ap.add_argument("--json", action="store_true", help="print raw JSON (debug)")
-    args = ap.parse_args()
-
-    try:
-        domain = validate_domain(args.domain)
-        api_key = load_config()
-    except Exception as e:
-        print(f"error: {e}", file=sys.stderr)
-        return 2
-
-    st = SecurityTrails(api_key)
+def query_domain(st: Any, domain: str, mode: str) -> Any:
+    if mode == "info":
+        return st.domain_info(domain)
+    if mode == "subdomains":
+        return st.domain_subdomains(domain)
+    if mode == "whois":
+        return st.domain_whois(domain)
+    if mode == "history_dns":
+        return st.domain_history_dns(domain)
+    if mode == "history_whois":
+        return st.domain_history_whois(domain)
+    if mode == "tags":
+        return st.domain_tags(domain)
+    raise ValueError("unknown mode")
 
-    try:
-        if args.mode == "info":
-            data = st.domain_info(domain)
-        elif args.mode == "subdomains":
-            data = st.domain_subdomains(domain)
-        elif args.mode == "whois":
-            data = st.domain_whois(domain)
-        elif args.mode == "history_dns":
-            data = st.domain_history_dns(domain)
-        elif args.mode == "history_whois":
-            data = st.domain_history_whois(domain)
-        elif args.mode == "tags":
-            data = st.domain_tags(domain)
-        else:
-            print("error: unknown mode", file=sys.stderr)
-            return 2
-    except SecurityTrailsError as e:
-        print(f"error: securitytrails_error: {e}", file=sys.stderr)
-        return 1
-    except Exception as e:
-        print(f"error: lookup_failed: {e}", file=sys.stderr)
-        return 1
 
-    if args.json:
-        print(json.dumps({"domain": domain, "mode": args.mode, "data": data}, ensure_ascii=False, indent=2))
-        return 0
+def print_result(domain: str, mode: str, data: Any, limit: int, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps({"domain": domain, "mode": mode, "data": data}, ensure_ascii=False, indent=2))
+        return
 
-    print(f"[SecurityTrails] domain={domain} mode={args.mode}")
+    print(f"[SecurityTrails] domain={domain} mode={mode}")
     print("-" * 80)
 
     # Human-readable summary (best-effort; response shape varies)
-    if args.mode == "subdomains":
+    if mode == "subdomains":
         subs = None
         if isinstance(data, dict):
             subs = data.get("subdomains") or data.get("records") or data.get("data")
         if isinstance(subs, list):
-            print(f"subdomains: {len(subs)} (showing up to {args.limit})")
-            for s in subs[:args.limit]:
+            print(f"subdomains: {len(subs)} (showing up to {limit})")
+            for s in subs[:limit]:
                 if isinstance(s, str):
                     print(f" - {s}.{domain}")
                 else:
                     print(f" - {s}")
-            if len(subs) > args.limit:
-                print(f" ... ({len(subs)-args.limit} more)")
-            return 0
+            if len(subs) > limit:
+                print(f" ... ({len(subs)-limit} more)")
+            return
 
     if isinstance(data, dict):
         # show key highlights
@@ -112,14 +182,98 @@ def main() -> int:
             if k in data and data[k]:
                 v = data[k]
                 if isinstance(v, list):
-                    print(f"{k}: count={len(v)} top={v[:min(len(v), args.limit)]}")
+                    print(f"{k}: count={len(v)} top={v[:min(len(v), limit)]}")
                 else:
                     print(f"{k}: {str(v)[:200]}")
-        return 0
+        return
 
     print(str(data)[:800])
-    return 0
+
+
+def read_batch(stream: Any) -> List[str]:
+    """One domain per line; blank lines and '#' comments are skipped."""
+    out: List[str] = []
+    for line in stream:
+        v = line.strip()
+        if v and not v.startswith("#"):
+            out.append(v)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="SecurityTrails domain lookup via pysecuritytrails")
+    ap.add_argument("domain", nargs="?", help="target domain (e.g., example.com)")
+    ap.add_argument("--mode", choices=["info", "subdomains", "whois", "history_dns", "history_whois", "tags"], default="info")
+    ap.add_argument("--limit", type=int, default=50, help="max list items to print (default: 50)")
+    ap.add_argument("--json", action="store_true", help="print raw JSON (debug)")
+    ap.add_argument("--batch", action="store_true",
+                    help="read domains from stdin (one per line) and reuse one client")
+    ap.add_argument("--workers", type=int, default=4,
+                    help="concurrent lookups in --batch mode (default: 4)")
+    args = ap.parse_args()
+
+    if args.domain is None and not args.batch:
+        ap.error("domain is required unless --batch is given")
+
+    try:
+        domains = read_batch(sys.stdin) if args.batch else [validate_domain(args.domain)]
+        api_key = load_config()
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    from pysecuritytrails import SecurityTrails, SecurityTrailsError
+
+    st = SecurityTrails(api_key)
+
+    if not args.batch:
+        domain = domains[0]
+        try:
+            data = query_domain(st, domain, args.mode)
+        except SecurityTrailsError as e:
+            print(f"error: securitytrails_error: {e}", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"error: lookup_failed: {e}", file=sys.stderr)
+            return 1
+
+        print_result(domain, args.mode, data, args.limit, args.json)
+        return 0
+
+    def lookup_one(item: Tuple[str, Optional[str]]) -> Tuple[str, Any, Optional[str]]:
+        raw, domain = item
+        if domain is None:
+            return raw, None, "invalid_domain"
+        try:
+            return domain, query_domain(st, domain, args.mode), None
+        except SecurityTrailsError as e:
+            return domain, None, f"securitytrails_error: {e}"
+        except Exception as e:
+            return domain, None, f"lookup_failed: {e}"
+
+    # batch: the same SecurityTrails client for every domain, lookups run
+    # concurrently and are printed in input order
+    failed = 0
+    shown = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        checked = zip(domains, validate_domain_batch(domains))
+        for domain, data, err in pool.map(lookup_one, checked):
+            if err is not None:
+                print(f"error: {domain}: {err}", file=sys.stderr)
+                failed += 1
+                continue
+            if args.json:
+                # JSON Lines: one compact document per domain (as censys --batch --json)
+                print(json.dumps({"domain": domain, "mode": args.mode, "data": data},
+                                 ensure_ascii=False, separators=(",", ":")))
+                continue
+            if shown:
+                print()
+            print_result(domain, args.mode, data, args.limit, args.json)
+            shown += 1
+
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -9,7 +9,8 @@ Headless Selenium fetcher.
   - default: rendered HTML (page_source)
   - --text: visible text (best-effort)
   - --selector CSS: scope to a CSS selector (HTML or text)
-  - --screenshot path: save PNG screenshot
+  - --screenshot path: save screenshot (PNG, or JPEG/WebP by file extension)
+  - --out path: write content to a file (optionally --compress zstd) instead of stdout
 - Safety:
   - disables downloads
   - no extra navigation beyond the given URL (except redirects)
@@ -18,21 +19,33 @@ Headless Selenium fetcher.
 from __future__ import annotations
 
 import argparse
+import atexit
+import base64
 import os
 import sys
+import threading
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# selenium is imported where it is used so --help and bad-URL exits stay cheap
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 
-def build_driver(headless: bool = True) -> webdriver.Chrome:
+# Subresources that never affect extracted text. CSS is kept: it decides
+# what is visible, and therefore what --text returns.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+]
+
+
+def build_driver(headless: bool = True, block_resources: bool = False) -> webdriver.Chrome:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
     chrome_binary = os.getenv("CHROME_BINARY", "").strip() or None
     chromedriver_path = os.getenv("CHROMEDRIVER_PATH", "").strip() or None
 
@@ -40,6 +53,9 @@ def build_driver(headless: bool = True) -> webdriver.Chrome:
     if chrome_binary:
         opts.binary_location = chrome_binary
 
+    # driver.get() returns at DOMContentLoaded instead of waiting for every subresource
+    opts.page_load_strategy = "eager"
+
     # Headless
     if headless:
         # new headless (Chrome 109+)
@@ -68,7 +84,10 @@ def build_driver(headless: bool = True) -> webdriver.Chrome:
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True,
+        "profile.default_content_setting_values.notifications": 2,
     }
+    if block_resources:
+        prefs["profile.managed_default_content_settings.images"] = 2
     opts.add_experimental_option("prefs", prefs)
 
     service = ChromeService(executable_path=chromedriver_path) if chromedriver_path else ChromeService()
@@ -87,9 +106,80 @@ Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
     except Exception:
         pass
 
+    if block_resources:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception:
+            pass
+
     return driver
 
 
+# Idle Chrome instances, keyed by build options (see get_driver). A driver
+# is removed while a fetch uses it, so concurrent fetches never share one.
+_DRIVERS: Dict[Tuple[bool, bool], List[webdriver.Chrome]] = {}
+# Every pooled driver, idle or checked out, so _cleanup() can quit them all
+_ALL_DRIVERS: List[webdriver.Chrome] = []
+_DRIVERS_LOCK = threading.Lock()
+
+
+def get_driver(headless: bool = True, block_resources: bool = False) -> webdriver.Chrome:
+    """
+    Check out an idle driver for these options, or build a new one when none
+    is free. Hand it back with _release_driver(); quit at exit by _cleanup().
+    """
+    key = (headless, block_resources)
+    with _DRIVERS_LOCK:
+        idle = _DRIVERS.get(key)
+        if idle:
+            return idle.pop()
+    # built outside the lock: starting Chrome takes a while
+    driver = build_driver(headless=headless, block_resources=block_resources)
+    with _DRIVERS_LOCK:
+        _ALL_DRIVERS.append(driver)
+    return driver
+
+
+def _release_driver(driver: webdriver.Chrome, key: Tuple[bool, bool], broken: bool) -> None:
+    """
+    Clear cookies/cache and return the driver to the idle pool; a driver that
+    failed (or cannot be reset) is dropped from the pool and quit.
+    """
+    if not broken:
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            with _DRIVERS_LOCK:
+                _DRIVERS.setdefault(key, []).append(driver)
+            return
+        except Exception:
+            pass
+
+    with _DRIVERS_LOCK:
+        if driver in _ALL_DRIVERS:
+            _ALL_DRIVERS.remove(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _cleanup() -> None:
+    with _DRIVERS_LOCK:
+        drivers = list(_ALL_DRIVERS)
+        _ALL_DRIVERS.clear()
+        _DRIVERS.clear()
+    for d in drivers:
+        try:
+            d.quit()
+        except Exception:
+            pass
+
+
+atexit.register(_cleanup)
+
+
 def validate_url(url: str) -> str:
     u = url.strip()
     if not u:
@@ -106,23 +196,33 @@ def fetch(
     selector: Optional[str],
     as_text: bool,
     screenshot_path: Optional[str],
+    fresh: bool = False,
 ) -> str:
+    """
+    Load url and return its HTML/text. Chrome instances are pooled and
+    reused across calls (one per concurrent fetch) unless fresh=True
+    (new browser, quit afterwards).
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    # images/fonts/media are only skipped when nothing is rendered for a human
+    block = as_text and not screenshot_path
+
     driver = None
+    broken = True
     try:
-        driver = build_driver(headless=True)
+        if fresh:
+            driver = build_driver(headless=True, block_resources=block)
+        else:
+            driver = get_driver(headless=True, block_resources=block)
         driver.set_page_load_timeout(timeout)
 
+        # eager page load strategy: returns once the DOM is ready
         driver.get(url)
 
-        # Wait for DOM ready
-        try:
-            WebDriverWait(driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
-            )
-        except TimeoutException:
-            # continue; sometimes SPAs never reach complete
-            pass
-
         # Optional fixed wait (useful for SPAs)
         if wait_seconds > 0:
             time.sleep(wait_seconds)
@@ -137,40 +237,86 @@ def fetch(
                 # element not found; still output whatever we have
                 pass
 
-        # Screenshot
+        # Screenshot: driver.get() returned at DOM ready, so let images and
+        # fonts finish (the load event) before capturing
         if screenshot_path:
-            driver.save_screenshot(screenshot_path)
-
-        # Extract content
-        if selector:
-            elems = driver.find_elements(By.CSS_SELECTOR, selector)
-            if elems:
-                if as_text:
-                    # join visible texts
-                    return "\n\n".join([e.text for e in elems if e.text])
-                else:
-                    # outerHTML for each matched node
-                    return "\n\n".join(
-                        [driver.execute_script("return arguments[0].outerHTML;", e) for e in elems]
-                    )
-
-        # default full page
-        if as_text:
-            # best-effort visible text from body
             try:
-                body = driver.find_element(By.TAG_NAME, "body")
-                return body.text
-            except Exception:
-                return driver.page_source
-        else:
-            return driver.page_source
+                WebDriverWait(driver, timeout).until(
+                    lambda d: d.execute_script("return document.readyState") == "complete"
+                )
+            except TimeoutException:
+                # still loading; capture what has rendered so far
+                pass
+            _save_screenshot(driver, screenshot_path)
+
+        content = _extract(driver, selector, as_text)
+        broken = False
+        return content
 
     finally:
         if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            if fresh:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            else:
+                _release_driver(driver, (True, block), broken)
+
+
+# file extension -> Page.captureScreenshot format (anything else: png)
+_SCREENSHOT_FORMATS = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg", ".webp": "webp"}
+
+
+def _save_screenshot(driver: webdriver.Chrome, path: str) -> None:
+    """
+    Capture the viewport via CDP Page.captureScreenshot in the format given
+    by the file extension; JPEG/WebP at quality 80 are several times
+    smaller than PNG.
+    """
+    fmt = _SCREENSHOT_FORMATS.get(os.path.splitext(path)[1].lower(), "png")
+    params = {"format": fmt, "captureBeyondViewport": False}
+    if fmt != "png":
+        params["quality"] = 80
+    result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+    with open(path, "wb") as f:
+        f.write(base64.b64decode(result["data"]))
+
+
+# One round-trip for all matches instead of one per element
+_JS_SELECT_TEXT = (
+    "return Array.from(document.querySelectorAll(arguments[0]))"
+    ".map(function(e){return e.innerText;});"
+)
+_JS_SELECT_HTML = (
+    "return Array.from(document.querySelectorAll(arguments[0]))"
+    ".map(function(e){return e.outerHTML;});"
+)
+
+
+def _extract(driver: webdriver.Chrome, selector: Optional[str], as_text: bool) -> str:
+    from selenium.webdriver.common.by import By
+
+    if selector:
+        if as_text:
+            # visible text of each matched node
+            parts = driver.execute_script(_JS_SELECT_TEXT, selector)
+        else:
+            # outerHTML for each matched node
+            parts = driver.execute_script(_JS_SELECT_HTML, selector)
+        if parts:
+            return "\n\n".join([p for p in parts if p])
+
+    # default full page
+    if as_text:
+        # best-effort visible text from body
+        try:
+            body = driver.find_element(By.TAG_NAME, "body")
+            return body.text
+        except Exception:
+            return driver.page_source
+    else:
+        return driver.page_source
 
 
 def main() -> int:
@@ -185,15 +331,35 @@ def main() -> int:
     ap.add_argument("--text", action="store_true",
                     help="Output visible text instead of HTML")
     ap.add_argument("--screenshot", type=str, default=None,
-                    help="Save screenshot PNG to this path")
+                    help="Save screenshot to this path (.png, or .jpg/.webp for smaller files)")
+    ap.add_argument("--fresh", action="store_true",
+                    help="Use a new browser for this fetch instead of the reused one")
+    ap.add_argument("--out", type=str, default=None,
+                    help="Write content to this file (UTF-8 bytes) instead of printing it")
+    ap.add_argument("--compress", choices=["none", "zstd"], default="none",
+                    help="Compress --out with zstd (requires the zstandard package)")
     args = ap.parse_args()
 
+    if args.compress != "none" and not args.out:
+        ap.error("--compress requires --out")
+
     try:
         url = validate_url(args.url)
     except ValueError as e:
         print(f"error: {e}", file=sys.stderr)
         return 2
 
+    # fail before launching a browser if the compressor is missing
+    zstandard = None
+    if args.compress == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            print("error: zstandard_not_installed (pip install zstandard)", file=sys.stderr)
+            return 2
+
+    from selenium.common.exceptions import WebDriverException
+
     try:
         content = fetch(
             url=url,
@@ -202,6 +368,7 @@ def main() -> int:
             selector=args.selector,
             as_text=args.text,
             screenshot_path=args.screenshot,
+            fresh=args.fresh,
         )
     except WebDriverException as e:
         print(f"error: selenium_webdriver_failed: {e}", file=sys.stderr)
@@ -218,6 +385,22 @@ def main() -> int:
         print(f"[selenium-fetch] mode={'text' if args.text else 'html'}")
     if args.screenshot:
         print(f"[selenium-fetch] screenshot={args.screenshot}")
+
+    if args.out:
+        # one binary write instead of streaming through the text layer
+        data = content.encode("utf-8", "replace")
+        raw_len = len(data)
+        if zstandard is not None:
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+        try:
+            with open(args.out, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"error: write_failed: {e}", file=sys.stderr)
+            return 1
+        print(f"[selenium-fetch] out={args.out} compress={args.compress} bytes={len(data)} (raw {raw_len})")
+        return 0
+
     print("-" * 80)
     print(content)
 
@@ -225,4 +408,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
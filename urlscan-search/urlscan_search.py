@@ -4,27 +4,158 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
 import json
 import os
+import sqlite3
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Final, List, Optional, Tuple
 
-import urlscan
+try:
+    import orjson  # optional: faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+
+# API keys file; OPENCLAW_CONFIG points elsewhere without code edits
+_CONFIG_PATH: Final[str] = os.environ.get("OPENCLAW_CONFIG", "/home/ubuntu/.openclaw/api_config.json")
+
+# Result field names, interned once and shared by every handler
+_ID, _PAGE, _TASK, _URL, _DOMAIN, _IP, _UUID, _TIME = map(
+    sys.intern, ("_id", "page", "task", "url", "domain", "ip", "uuid", "time")
+)
+
+# Local cache for `get`: a finished scan result does not change
+CACHE_PATH = "/home/ubuntu/.openclaw/cache/urlscan-search.sqlite3"
+CACHE_TTL = 24 * 3600
+
+@functools.lru_cache(maxsize=1)
+def _load_api_config(path: str, mtime_ns: int) -> Dict[str, Any]:
+    # one parse per process; mtime_ns in the key invalidates on edit
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def load_config():
-    file_path = "/home/ubuntu/.openclaw/api_config.json"
-    with open(file_path, "r", encoding="utf-8") as f:
-        config = json.load(f)
+    config = _load_api_config(_CONFIG_PATH, os.stat(_CONFIG_PATH).st_mtime_ns)
     return config.get("api_token", {}).get("urlscan-search", {}).get("api_key", "")
 
-def print_title(s: str) -> None:
-    print(s)
-    print("-" * 80)
 
+@functools.lru_cache(maxsize=1)
+def _cache_db() -> Optional[sqlite3.Connection]:
+    # best-effort: any failure here just means lookups are not cached
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        db = sqlite3.connect(CACHE_PATH, timeout=5)
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)")
+        return db
+    except (OSError, sqlite3.Error):
+        return None
 
-def main() -> int:
+
+def cache_get(key: str, ttl: float) -> Optional[Any]:
+    db = _cache_db()
+    if db is None:
+        return None
+    try:
+        row = db.execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or time.time() - row[0] > ttl:
+        return None
+    return json.loads(row[1])
+
+
+def cache_set(key: str, value: Any) -> None:
+    db = _cache_db()
+    if db is None:
+        return
+    try:
+        with db:
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                       (key, time.time(), json.dumps(value, ensure_ascii=False, default=str)))
+    except sqlite3.Error:
+        pass
+
+
+def print_json(obj: Any) -> None:
+    if orjson is not None and hasattr(sys.stdout, "buffer"):
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS) + b"\n")
+        return
+    print(json.dumps(obj, ensure_ascii=False, indent=2))
+
+
+_SEP = "-" * 80 + "\n"
+
+
+def print_title(s: str, body: str = "") -> None:
+    """Title, separator and an optional pre-formatted body in one write."""
+    sys.stdout.write(f"{s}\n{_SEP}{body}")
+
+
+def format_search_row(r: Dict[str, Any]) -> str:
+    _id = r.get(_ID) or r.get(_UUID) or (r.get(_TASK) or {}).get(_UUID)
+    page = r.get(_PAGE) or {}
+    task = r.get(_TASK) or {}
+    return f"- id={_id} time={task.get(_TIME)} url={page.get(_URL)} domain={page.get(_DOMAIN)}"
+
+
+def read_batch(stream: Any) -> List[str]:
+    """One URL per line; blank lines and '#' comments are skipped."""
+    out: List[str] = []
+    for line in stream:
+        v = line.strip()
+        if v and not v.startswith("#"):
+            out.append(v)
+    return out
+
+
+def _submit_one(client: Any, url: str, visibility: str) -> Dict[str, Any]:
+    """Returns {"key": url, "result"|"error": ...}; never raises so batch workers keep going."""
+    try:
+        return {"key": url, "result": client.scan(url, visibility=visibility)}
+    except Exception as e:
+        return {"key": url, "error": str(e)}
+
+
+def _scan_wait_get(client: Any, url: str, visibility: str, *, timeout: float = 120.0) -> Tuple[str, Dict[str, Any]]:
+    """
+    Submit url, then poll the result itself (404 until the scan finishes) with
+    delays of 5s growing x1.5 up to 15s. Each poll is a single GET, and the
+    poll that succeeds already carries the result. Sleeps are capped at the
+    time left, so the last poll happens at the deadline, not after it.
+    """
+    import urlscan
+
+    res = client.scan(url, visibility=visibility)
+    uuid = res.get(_UUID)
+    if not uuid:
+        raise ValueError(f"scan_not_accepted: {res}")
+
+    delay = 5.0
+    deadline = time.monotonic() + timeout
+    while True:
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        try:
+            return uuid, client.get_result(uuid)
+        except urlscan.APIError as e:
+            if e.status != 404:
+                raise
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"result for {uuid} not ready after {timeout:.0f}s")
+        delay = min(delay * 1.5, 15.0)
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(description="urlscan.io client via urlscan-python")
     sub = ap.add_subparsers(dest="cmd", required=True)
 
@@ -32,18 +163,33 @@ def main() -> int:
     p_scan.add_argument("url", help="target URL")
     p_scan.add_argument("--visibility", choices=["public", "unlisted", "private"], default="unlisted")
     p_scan.add_argument("--no-wait", action="store_true", help="do not wait for result")
+    p_scan.add_argument("--timeout", type=float, default=120.0, help="max seconds to wait for the result (default: 120)")
     p_scan.add_argument("--json", action="store_true", help="print raw JSON")
 
+    p_batch = sub.add_parser("scan-batch", help="submit many URLs (one per line) without waiting")
+    p_batch.add_argument("urls_file", nargs="?", default="-", help="file with URLs, or - for stdin (default)")
+    p_batch.add_argument("--visibility", choices=["public", "unlisted", "private"], default="unlisted")
+    p_batch.add_argument("--concurrency", type=int, default=2,
+                         help="submissions in flight at once (default: 2)")
+    p_batch.add_argument("--json", action="store_true", help="print raw JSON")
+
     p_search = sub.add_parser("search", help="search scans")
     p_search.add_argument("query", help='search query, e.g. "page.domain:example.com"')
     p_search.add_argument("--limit", type=int, default=10)
     p_search.add_argument("--json", action="store_true", help="print raw JSON")
+    p_search.add_argument("--stream", action="store_true",
+                          help="print each result as it arrives (with --json: one JSON object per line)")
 
     p_get = sub.add_parser("get", help="get result by uuid")
     p_get.add_argument("uuid", help="scan uuid")
     p_get.add_argument("--json", action="store_true", help="print raw JSON")
+    p_get.add_argument("--no-cache", action="store_true", help="always query urlscan.io (bypass the local cache)")
+
+    return ap
 
-    args = ap.parse_args()
+
+def main() -> int:
+    args = _build_parser().parse_args()
 
     try:
         api_key = load_config()
@@ -51,84 +197,110 @@ def main() -> int:
         print(f"error: {e}", file=sys.stderr)
         return 2
 
-    client = urlscan.Client(api_key)
+    # imported after argument parsing so --help and usage errors stay fast
+    import urlscan
+
+    # scan-batch: let the client sleep out 429s (X-Rate-Limit-Reset-After)
+    # instead of failing the rest of the batch
+    client = urlscan.Client(api_key, retry=args.cmd == "scan-batch")
 
     try:
         if args.cmd == "scan":
-            if not args.no_wait and hasattr(client, "scan_and_get_result"):
-                result = client.scan_and_get_result(args.url, visibility=args.visibility)
+            if args.no_wait:
+                res = client.scan(args.url, visibility=args.visibility)
                 if args.json:
-                    print(json.dumps(result, ensure_ascii=False, indent=2))
+                    print_json(res)
                 else:
-                    print_title(f"[urlscan] scan url={args.url} visibility={args.visibility}")
-                    page = result.get("page") or {}
-                    task = result.get("task") or {}
-                    print(f"uuid: {task.get('uuid') or result.get('uuid')}")
-                    print(f"time: {task.get('time')}")
-                    print(f"page.url: {page.get('url')}")
-                    print(f"page.domain: {page.get('domain')}")
-                    print(f"page.ip: {page.get('ip')}")
+                    print_title(
+                        f"[urlscan] scan submitted url={args.url} visibility={args.visibility}",
+                        f"uuid: {res.get(_UUID)}\n"
+                        f"result: {res}\n",
+                    )
                 return 0
 
-            # fallback scan -> (optional) wait -> get
-            res = client.scan(args.url, visibility=args.visibility)
-            uuid = res.get("uuid")
-            if args.no_wait or not uuid:
-                if args.json:
-                    print(json.dumps(res, ensure_ascii=False, indent=2))
-                else:
-                    print_title(f"[urlscan] scan submitted url={args.url} visibility={args.visibility}")
-                    print(f"uuid: {uuid}")
-                    print(f"result: {res}")
-                return 0
-
-            client.wait_for_result(uuid)
-            result = client.get_result(uuid)
+            uuid, result = _scan_wait_get(client, args.url, args.visibility, timeout=args.timeout)
             if args.json:
-                print(json.dumps(result, ensure_ascii=False, indent=2))
+                print_json(result)
             else:
-                print_title(f"[urlscan] scan url={args.url} uuid={uuid}")
-                page = result.get("page") or {}
-                task = result.get("task") or {}
-                print(f"time: {task.get('time')}")
-                print(f"page.url: {page.get('url')}")
-                print(f"page.domain: {page.get('domain')}")
-                print(f"page.ip: {page.get('ip')}")
+                page = result.get(_PAGE) or {}
+                task = result.get(_TASK) or {}
+                print_title(
+                    f"[urlscan] scan url={args.url} visibility={args.visibility}",
+                    f"uuid: {uuid}\n"
+                    f"time: {task.get(_TIME)}\n"
+                    f"page.url: {page.get(_URL)}\n"
+                    f"page.domain: {page.get(_DOMAIN)}\n"
+                    f"page.ip: {page.get(_IP)}\n",
+                )
             return 0
 
+        if args.cmd == "scan-batch":
+            if args.urls_file == "-":
+                urls = read_batch(sys.stdin)
+            else:
+                with open(args.urls_file, "r", encoding="utf-8") as f:
+                    urls = read_batch(f)
+
+            # submissions share the client's HTTP session; results keep input order
+            with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+                results = list(pool.map(lambda u: _submit_one(client, u, args.visibility), urls))
+
+            if args.json:
+                print_json(results)
+            else:
+                print_title(
+                    f"[urlscan] scan-batch urls={len(urls)} visibility={args.visibility}",
+                    "".join(
+                        f"- url={r['key']} error={r['error']}\n" if "error" in r
+                        else f"- url={r['key']} uuid={r['result'].get(_UUID)}\n"
+                        for r in results
+                    ),
+                )
+            return 0 if all("error" not in r for r in results) else 1
+
         if args.cmd == "search":
-            out = []
-            i = 0
-            for r in client.search(args.query):
-                out.append(r)
-                i += 1
-                if i >= args.limit:
-                    break
+            results = itertools.islice(client.search(args.query), max(0, args.limit))
+            if args.stream:
+                # nothing is accumulated: each result is printed and dropped
+                if not args.json:
+                    print_title(f"[urlscan] search query={args.query} limit={args.limit}")
+                for r in results:
+                    if args.json:
+                        print(json.dumps(r, ensure_ascii=False), flush=True)
+                    else:
+                        print(format_search_row(r), flush=True)
+                return 0
+
+            out = list(results)
             if args.json:
-                print(json.dumps({"query": args.query, "results": out}, ensure_ascii=False, indent=2))
+                print_json({"query": args.query, "results": out})
             else:
-                print_title(f"[urlscan] search query={args.query} limit={args.limit}")
-                print(f"results: {len(out)}")
-                for r in out:
-                    _id = r.get("_id") or r.get("uuid") or (r.get("task") or {}).get("uuid")
-                    page = r.get("page") or {}
-                    task = r.get("task") or {}
-                    print(f"- id={_id} time={task.get('time')} url={page.get('url')} domain={page.get('domain')}")
+                print_title(
+                    f"[urlscan] search query={args.query} limit={args.limit}",
+                    f"results: {len(out)}\n" + "".join(format_search_row(r) + "\n" for r in out),
+                )
             return 0
 
         if args.cmd == "get":
-            result = client.get_result(args.uuid)
+            key = f"result:{args.uuid}"
+            result = None if args.no_cache else cache_get(key, CACHE_TTL)
+            if result is None:
+                result = client.get_result(args.uuid)
+                if not args.no_cache:
+                    cache_set(key, result)
             if args.json:
-                print(json.dumps(result, ensure_ascii=False, indent=2))
+                print_json(result)
             else:
-                print_title(f"[urlscan] get uuid={args.uuid}")
-                page = result.get("page") or {}
-                task = result.get("task") or {}
-                print(f"time: {task.get('time')}")
-                print(f"page.url: {page.get('url')}")
-                print(f"page.domain: {page.get('domain')}")
-                print(f"page.ip: {page.get('ip')}")
-                print(f"keys: {list(result.keys())[:20]}")
+                page = result.get(_PAGE) or {}
+                task = result.get(_TASK) or {}
+                print_title(
+                    f"[urlscan] get uuid={args.uuid}",
+                    f"time: {task.get(_TIME)}\n"
+                    f"page.url: {page.get(_URL)}\n"
+                    f"page.domain: {page.get(_DOMAIN)}\n"
+                    f"page.ip: {page.get(_IP)}\n"
+                    f"keys: {list(result.keys())[:20]}\n",
+                )
             return 0
 
         print("error: unknown command", file=sys.stderr)
@@ -140,4 +312,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -4,8 +4,10 @@
 """
 VirusTotal lookup using vt-py (VirusTotal official Python client: 'vt').
 
-- Single argument only: ip or url or domain or hash
+- One or more IOCs: ip or url or domain or hash (--batch also reads stdin)
 - Auto-detects IOC type and queries VT v3 accordingly
+- --known-bad FILE: IOCs listed there are reported locally, not queried
+- Reports are cached locally; --no-cache always queries VT
 
 Install:
   pip install vt-py
@@ -13,24 +15,71 @@ Install:
 
 from __future__ import annotations
 
+import argparse
+import contextlib
+import functools
 import ipaddress
 import os
-import re
+import sqlite3
+import string
 import sys
 import json
-from typing import Literal, Tuple
+import time
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Final, List, Literal, Optional, Tuple
 
-import vt  # vt-py
+# vt-py (and aiohttp under it) is imported where it is used, so --help,
+# bad input and runs answered entirely by --known-bad never load it
+if TYPE_CHECKING:
+    import vt
 
+try:
+    import orjson  # optional: faster config parse
+except ImportError:
+    orjson = None
 
-HASH_RE = re.compile(r"^[A-Fa-f0-9]{32}$|^[A-Fa-f0-9]{40}$|^[A-Fa-f0-9]{64}$")
-DOMAIN_RE = re.compile(
-    r"^(?=.{1,253}\.?$)(?:(?!-)[A-Za-z0-9-]{1,63}(?<!-)\.)+[A-Za-z]{2,63}\.?$"
-)
+
+# API keys file; OPENCLAW_CONFIG points elsewhere without code edits
+_CONFIG_PATH: Final[str] = os.environ.get("OPENCLAW_CONFIG", "/home/ubuntu/.openclaw/api_config.json")
+
+# MD5 / SHA1 / SHA256 hex digest lengths
+_HASH_LENGTHS = (32, 40, 64)
+_HEX_CHARS = frozenset(string.hexdigits)
+# characters an IPv4 / IPv6 address (without %scope) can contain
+_IPV4_CHARS = frozenset("0123456789.")
+_IPV6_CHARS = frozenset("0123456789abcdefABCDEF:.")
+# bytes allowed in a domain name (checked with bytes.translate deletion)
+_DOMAIN_BYTES = (string.ascii_letters + string.digits + "-.").encode("ascii")
 
 
 IocType = Literal["hash", "ip", "domain", "url"]
 
+# Local response cache (SQLite); reports for a file hash change slowly,
+# reputation of ip/domain/url more often
+CACHE_PATH = "/home/ubuntu/.openclaw/cache/vt-search.sqlite3"
+CACHE_TTL = {"hash": 24 * 3600, "ip": 3600, "domain": 3600, "url": 3600}
+
+
+def _is_domain(v: str) -> bool:
+    """
+    Label-by-label domain check (1-63 chars of [A-Za-z0-9-], no leading or
+    trailing hyphen, alphabetic TLD of 2+ chars); linear, no backtracking.
+    """
+    if v.endswith("."):
+        v = v[:-1]
+    if not v or len(v) > 253 or not v.isascii():
+        return False
+    if v.encode("ascii").translate(None, _DOMAIN_BYTES):
+        return False
+    labels = v.split(".")
+    if len(labels) < 2:
+        return False
+    for label in labels:
+        if not 1 <= len(label) <= 63 or label[0] == "-" or label[-1] == "-":
+            return False
+    tld = labels[-1]
+    return len(tld) >= 2 and tld.isalpha()
+
 
 def detect_ioc(value: str) -> Tuple[IocType, str]:
     v = value.strip()
@@ -41,19 +90,25 @@ def detect_ioc(value: str) -> Tuple[IocType, str]:
     if "://" in v:
         return "url", v
 
-    # IP
-    try:
-        ipaddress.ip_address(v)
-        return "ip", v
-    except ValueError:
-        pass
-
-    # Hash
-    if HASH_RE.fullmatch(v):
+    # Hash: checked first, without exceptions (a hex digest is never an IP)
+    if len(v) in _HASH_LENGTHS and _HEX_CHARS.issuperset(v):
         return "hash", v.lower()
 
+    # IPv4: dotted quad checked directly (same rules as ipaddress: 0-255, no leading zeros)
+    if v.count(".") == 3 and _IPV4_CHARS.issuperset(v):
+        if all(p and len(p) <= 3 and (p == "0" or p[0] != "0") and int(p) < 256 for p in v.split(".")):
+            return "ip", v
+
+    # IPv6: only charset-plausible strings reach ipaddress (and its ValueError)
+    elif ":" in v and _IPV6_CHARS.issuperset(v.partition("%")[0]):
+        try:
+            ipaddress.ip_address(v)
+            return "ip", v
+        except ValueError:
+            pass
+
     # Domain
-    if DOMAIN_RE.fullmatch(v):
+    if _is_domain(v):
         return "domain", v.rstrip(".").lower()
 
     # Fallback: domain-like token
@@ -63,128 +118,266 @@ def detect_ioc(value: str) -> Tuple[IocType, str]:
     raise ValueError("unsupported_ioc_type")
 
 
-def safe_get(d: dict, path: str):
-    cur = d
-    for p in path.split("."):
-        if not isinstance(cur, dict):
-            return None
-        cur = cur.get(p)
-    return cur
+@functools.lru_cache(maxsize=1)
+def _load_api_config(path: str, mtime_ns: int) -> Dict[str, Any]:
+    # one parse per process; mtime_ns in the key invalidates on edit
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def load_config():
-    file_path = "/home/ubuntu/.openclaw/api_config.json"
-    with open(file_path, "r", encoding="utf-8") as f:
-        config = json.load(f)
+    config = _load_api_config(_CONFIG_PATH, os.stat(_CONFIG_PATH).st_mtime_ns)
     return config.get("api_token", {}).get("virustotal-search", {}).get("vt_token", "")
 
 
-def main() -> int:
-    if len(sys.argv) != 2:
-        print("usage: vt_lookup.py <ioc>", file=sys.stderr)
-        return 2
+def lookup(client: vt.Client, ioc_type: IocType, ioc: str) -> Dict[str, Any]:
+    import vt  # vt-py
 
-    try:
-        api_key = load_config()
-    except Exception:
-        print("error: failed to load VT API key", file=sys.stderr)
-        return 2
+    if ioc_type == "hash":
+        obj = client.get_object(f"/files/{ioc}")
+    elif ioc_type == "ip":
+        obj = client.get_object(f"/ip_addresses/{ioc}")
+    elif ioc_type == "domain":
+        obj = client.get_object(f"/domains/{ioc}")
+    elif ioc_type == "url":
+        # vt-py supports passing raw URL to /urls endpoint (it will handle encoding),
+        # but behavior depends on version; safest approach is to use /urls with vt.url_id
+        url_id = vt.url_id(ioc)  # base64url without '='
+        obj = client.get_object(f"/urls/{url_id}")
+    else:
+        raise ValueError("unsupported_ioc_type")
 
-    ioc_raw = sys.argv[1]
-    try:
-        ioc_type, ioc = detect_ioc(ioc_raw)
-    except ValueError as e:
-        print(f"error: {e}", file=sys.stderr)
-        return 2
+    # obj is vt.object.Object-like; convert to dict safely
+    return obj.to_dict() if hasattr(obj, "to_dict") else dict(obj)
 
-    # vt-py client
-    with vt.Client(api_key) as client:
-        try:
-            if ioc_type == "hash":
-                obj = client.get_object(f"/files/{ioc}")
-            elif ioc_type == "ip":
-                obj = client.get_object(f"/ip_addresses/{ioc}")
-            elif ioc_type == "domain":
-                obj = client.get_object(f"/domains/{ioc}")
-            elif ioc_type == "url":
-                # vt-py supports passing raw URL to /urls endpoint (it will handle encoding),
-                # but behavior depends on version; safest approach is to use /urls with vt.url_id
-                url_id = vt.url_id(ioc)  # base64url without '='
-                obj = client.get_object(f"/urls/{url_id}")
-            else:
-                print("error: unsupported_ioc_type", file=sys.stderr)
-                return 2
-        except vt.error.APIError as e:
-            # includes 404/401/429 etc
-            print(f"error: vt_api_error: {e}", file=sys.stderr)
-            return 1
 
-    # obj is vt.object.Object-like; convert to dict safely
-    data = obj.to_dict() if hasattr(obj, "to_dict") else dict(obj)
+# type-specific attributes, printed in this order when not None
+_EXTRA_FIELDS = {
+    "hash": ("meaningful_name", "type_description", "size"),
+    "ip": ("asn", "as_owner", "country", "network"),
+    "domain": ("registrar", "creation_date", "last_dns_records_date"),
+    "url": (),
+}
 
+
+def print_result(ioc_raw: str, ioc_type: IocType, ioc: str, data: Dict[str, Any]) -> None:
+    """Human-readable summary, printed straight from the VT object dict."""
     attrs = data.get("attributes") or {}
-    stats = attrs.get("last_analysis_stats") or {}
-
-    summary = {
-        "ioc": ioc_raw,
-        "ioc_type": ioc_type,
-        "id": data.get("id"),
-        "vt_type": data.get("type"),
-        "reputation": attrs.get("reputation"),
-        "last_analysis_date": attrs.get("last_analysis_date"),
-        "last_analysis_stats": {
-            "malicious": stats.get("malicious"),
-            "suspicious": stats.get("suspicious"),
-            "harmless": stats.get("harmless"),
-            "undetected": stats.get("undetected"),
-        },
-    }
-
-    # type-specific extras
+    s = attrs.get("last_analysis_stats") or {}
+
+    print(f"[VirusTotal] type={ioc_type} ioc={ioc_raw}")
+    print(f"- id: {data.get('id')} / vt_type: {data.get('type')}")
+    print(f"- verdict: malicious={s.get('malicious')} suspicious={s.get('suspicious')} harmless={s.get('harmless')} undetected={s.get('undetected')}")
+    print(f"- reputation: {attrs.get('reputation')}  last_analysis_date: {attrs.get('last_analysis_date')}")
+
+    # Show a few extras if present
+    for k in _EXTRA_FIELDS[ioc_type]:
+        v = attrs.get(k)
+        if v is not None:
+            print(f"- {k}: {v}")
+    if ioc_type == "url":
+        print(f"- url: {attrs.get('url') or ioc}")
+
     if ioc_type == "hash":
-        summary["meaningful_name"] = attrs.get("meaningful_name")
-        summary["type_description"] = attrs.get("type_description")
-        summary["size"] = attrs.get("size")
-        names = (attrs.get("names") or [])[:10]
+        names = attrs.get("names")
         if names:
-            summary["names_top10"] = names
-    elif ioc_type == "ip":
-        summary["asn"] = attrs.get("asn")
-        summary["as_owner"] = attrs.get("as_owner")
-        summary["country"] = attrs.get("country")
-        summary["network"] = attrs.get("network")
-    elif ioc_type == "domain":
-        summary["registrar"] = attrs.get("registrar")
-        summary["creation_date"] = attrs.get("creation_date")
-        summary["last_dns_records_date"] = attrs.get("last_dns_records_date")
+            print(f"- names(top10): {', '.join(islice(names, 10))}")
+    elif ioc_type in ("domain", "url"):
         cats = attrs.get("categories")
         if isinstance(cats, dict) and cats:
-            summary["categories_top5"] = dict(list(cats.items())[:5])
-    elif ioc_type == "url":
-        summary["url"] = attrs.get("url") or ioc
-        cats = attrs.get("categories")
-        if isinstance(cats, dict) and cats:
-            summary["categories_top5"] = dict(list(cats.items())[:5])
+            print("- categories(top5): " + ", ".join(f"{k}={v}" for k, v in islice(cats.items(), 5)))
 
-    # Human-readable output (simple)
-    s = summary["last_analysis_stats"]
-    print(f"[VirusTotal] type={summary['ioc_type']} ioc={summary['ioc']}")
-    print(f"- id: {summary['id']} / vt_type: {summary['vt_type']}")
-    print(f"- verdict: malicious={s.get('malicious')} suspicious={s.get('suspicious')} harmless={s.get('harmless')} undetected={s.get('undetected')}")
-    print(f"- reputation: {summary.get('reputation')}  last_analysis_date: {summary.get('last_analysis_date')}")
 
-    # Show a few extras if present
-    for k in ("meaningful_name", "type_description", "size", "asn", "as_owner", "country", "network", "registrar", "creation_date", "last_dns_records_date", "url"):
-        if k in summary and summary[k] is not None:
-            print(f"- {k}: {summary[k]}")
-    if "names_top10" in summary:
-        print(f"- names(top10): {', '.join(summary['names_top10'])}")
-    if "categories_top5" in summary:
-        cats = summary["categories_top5"]
-        print("- categories(top5): " + ", ".join([f"{k}={v}" for k, v in cats.items()]))
+@functools.lru_cache(maxsize=1)
+def _cache_db() -> Optional[sqlite3.Connection]:
+    # best-effort: any failure here just means lookups are not cached
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        db = sqlite3.connect(CACHE_PATH, timeout=5)
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)")
+        return db
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def cache_get(key: str, ttl: float) -> Optional[Any]:
+    db = _cache_db()
+    if db is None:
+        return None
+    try:
+        row = db.execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or time.time() - row[0] > ttl:
+        return None
+    return json.loads(row[1])
+
+
+def cache_set(key: str, value: Any) -> None:
+    db = _cache_db()
+    if db is None:
+        return
+    try:
+        with db:
+            # default=str: vt-py turns *_date attributes into datetime objects
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                       (key, time.time(), json.dumps(value, ensure_ascii=False, default=str)))
+    except sqlite3.Error:
+        pass
+
+
+# A known-bad entry only counts when it sits on a name/URL boundary, so
+# "evil.com" flags "a.evil.com" and "http://evil.com/x" but not "notevil.com"
+_LEFT_BOUNDARY = frozenset("./@:")
+_RIGHT_BOUNDARY = frozenset(":/?#")
+
+
+def read_batch(stream: Any) -> List[str]:
+    """One IOC (or known-bad entry) per line; blank lines and '#' comments are skipped."""
+    out: List[str] = []
+    for line in stream:
+        v = line.strip()
+        if v and not v.startswith("#"):
+            out.append(v)
+    return out
+
+
+def _on_boundary(s: str, start: int, end: int) -> bool:
+    return (start == 0 or s[start - 1] in _LEFT_BOUNDARY) and (end == len(s) or s[end] in _RIGHT_BOUNDARY)
+
+
+def build_known_bad_matcher(entries: List[str]) -> Callable[[str], Optional[str]]:
+    """
+    Returns match(ioc) -> the known-bad entry found in ioc (lowercased), or None.
+    Uses an Aho-Corasick automaton (pyahocorasick) when installed: one pass
+    per IOC regardless of list size. Otherwise each entry is searched in turn.
+    """
+    words = sorted({e.lower().rstrip(".") for e in entries if e.strip(".")})
 
-    return 0
+    try:
+        import ahocorasick
+    except ImportError:
+        ahocorasick = None
+
+    if ahocorasick is not None and words:
+        automaton = ahocorasick.Automaton()
+        for w in words:
+            automaton.add_word(w, w)
+        automaton.make_automaton()
+
+        def match(ioc: str) -> Optional[str]:
+            s = ioc.lower()
+            for end, w in automaton.iter(s):
+                if _on_boundary(s, end + 1 - len(w), end + 1):
+                    return w
+            return None
+
+        return match
+
+    def match(ioc: str) -> Optional[str]:
+        s = ioc.lower()
+        for w in words:
+            i = s.find(w)
+            while i != -1:
+                if _on_boundary(s, i, i + len(w)):
+                    return w
+                i = s.find(w, i + 1)
+        return None
+
+    return match
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="VirusTotal IOC lookup via vt-py (hash/ip/domain/url auto-detected)")
+    ap.add_argument("ioc", nargs="*", help="one or more IOCs")
+    ap.add_argument("--no-cache", action="store_true", help="always query VT (cached reports are neither read nor written)")
+    ap.add_argument("--batch", action="store_true", help="also read IOCs from stdin (one per line)")
+    ap.add_argument("--known-bad", type=str, default=None,
+                    help="file of known-malicious domains/IPs/hashes (one per line); matching IOCs are reported locally, not queried")
+    args = ap.parse_args()
+
+    iocs = list(args.ioc)
+    if args.batch:
+        iocs.extend(read_batch(sys.stdin))
+    if not iocs:
+        ap.error("no IOC given (pass IOCs as arguments or use --batch)")
+
+    known_bad = None
+    if args.known_bad:
+        try:
+            with open(args.known_bad, "r", encoding="utf-8") as f:
+                known_bad = build_known_bad_matcher(read_batch(f))
+        except OSError as e:
+            print(f"error: known_bad_unreadable: {e}", file=sys.stderr)
+            return 2
+
+    try:
+        api_key = load_config()
+    except Exception:
+        print("error: failed to load VT API key", file=sys.stderr)
+        return 2
+
+    # (ioc_raw, ioc_type, ioc, known-bad hit or None, cached report or None),
+    # in input order
+    targets = []
+    rc = 0
+    for ioc_raw in iocs:
+        try:
+            ioc_type, ioc = detect_ioc(ioc_raw)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            rc = 2
+            continue
+        hit = known_bad(ioc) if known_bad else None
+        data = None
+        if hit is None and not args.no_cache:
+            data = cache_get(f"{ioc_type}:{ioc}", CACHE_TTL[ioc_type])
+        targets.append((ioc_raw, ioc_type, ioc, hit, data))
+    if not targets:
+        return rc
+
+    client_ctx = contextlib.nullcontext()
+    # the API (and vt-py) is only needed for IOCs neither known-bad nor cached
+    if any(hit is None and data is None for _, _, _, hit, data in targets):
+        import vt  # vt-py
+
+        # one vt-py client (one aiohttp session, keep-alive connections) for every IOC
+        client_ctx = vt.Client(api_key)
+
+    # local hits and VT results are printed in one pass, in input order
+    shown = 0
+    with client_ctx as client:
+        for ioc_raw, ioc_type, ioc, hit, data in targets:
+            if hit is not None:
+                # answered locally: no API call, no quota spent
+                if shown:
+                    print()
+                print(f"[local] type={ioc_type} ioc={ioc_raw}")
+                print(f"- verdict: known_bad (matched {hit})")
+                shown += 1
+                continue
+
+            if data is None:
+                try:
+                    data = lookup(client, ioc_type, ioc)
+                except vt.error.APIError as e:
+                    # includes 404/401/429 etc
+                    print(f"error: vt_api_error: {e}", file=sys.stderr)
+                    rc = max(rc, 1)
+                    continue
+                if not args.no_cache:
+                    cache_set(f"{ioc_type}:{ioc}", data)
+
+            if shown:
+                print()
+            print_result(ioc_raw, ioc_type, ioc, data)
+            shown += 1
+
+    return rc
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
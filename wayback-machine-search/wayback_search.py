@@ -10,7 +10,7 @@ Wayback Machine lookup via waybackpy.
 - Modes:
   - newest
   - oldest
-  - near (year/month/day/hour/minute or --wayback-ts or --unix-ts)
+  - near (year/month/day/hour/minute or --wayback-ts or --unix-ts); --batch reads many URLs from stdin
   - snapshots (range with --start/--end, prints up to --limit)
   - save (Save API)
 
@@ -24,14 +24,41 @@ Install:
 from __future__ import annotations
 
 import argparse
+import functools
+import json
+import operator
 import os
+import sqlite3
 import sys
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from waybackpy import WaybackMachineCDXServerAPI, WaybackMachineSaveAPI  # per official docs
+# waybackpy (requests and friends) is imported in the modes that call it,
+# so --help, bad URLs and cached newest/oldest do not pay for it
+if TYPE_CHECKING:
+    from waybackpy import WaybackMachineCDXServerAPI
 
 
-DEFAULT_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"
+# snapshot lines are written in chunks of this size (bounded buffer, few writes)
+_WRITE_CHUNK = 1024
+
+# Local cache for newest/oldest captures (they change at most a few times a day)
+CACHE_PATH = "/home/ubuntu/.openclaw/cache/wayback-machine-search.sqlite3"
+CACHE_TTL = 24 * 3600
+
+# CDXSnapshot attributes kept in the cache (everything print_capture shows)
+_CAPTURE_FIELDS = ("archive_url", "original", "timestamp", "datetime_timestamp", "statuscode", "mimetype", "urlkey")
+
+# every field print_capture shows except the optional urlkey, fetched in one call
+_CAPTURE_GETTER = operator.attrgetter(*_CAPTURE_FIELDS[:-1])
+
+# resolved once at import; WAYBACK_USER_AGENT overrides the browser-like default
+DEFAULT_UA = os.environ.get("WAYBACK_USER_AGENT", "").strip() or (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"
+)
 
 
 def validate_url(url: str) -> str:
@@ -43,8 +70,79 @@ def validate_url(url: str) -> str:
     return u
 
 
-def get_default_user_agent() -> str:
-    return DEFAULT_UA
+@functools.lru_cache(maxsize=128)
+def _cdx(url: str, ua: str, kw_items: Tuple[Tuple[str, Any], ...] = ()) -> WaybackMachineCDXServerAPI:
+    """
+    One CDX client per (url, ua, kwargs) per process. Only for newest/oldest/near:
+    near() rewrites closest/sort/limit on every call, so those queries do not
+    depend on earlier ones, but a client used by them is no longer fit for snapshots().
+    """
+    from waybackpy import WaybackMachineCDXServerAPI  # per official docs
+
+    return WaybackMachineCDXServerAPI(url, ua, **dict(kw_items))
+
+
+@functools.lru_cache(maxsize=1)
+def _cache_db() -> Optional[sqlite3.Connection]:
+    # best-effort: any failure here just means lookups are not cached
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        db = sqlite3.connect(CACHE_PATH, timeout=5)
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)")
+        return db
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def cache_get(key: str, ttl: float) -> Optional[Any]:
+    db = _cache_db()
+    if db is None:
+        return None
+    try:
+        row = db.execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or time.time() - row[0] > ttl:
+        return None
+    return json.loads(row[1])
+
+
+def cache_set(key: str, value: Any) -> None:
+    db = _cache_db()
+    if db is None:
+        return
+    try:
+        with db:
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                       (key, time.time(), json.dumps(value, ensure_ascii=False, default=str)))
+    except sqlite3.Error:
+        pass
+
+
+def _cached_capture(key: str, use_cache: bool, fetch) -> Any:
+    """
+    Return the capture stored under key, or call fetch() and store its fields.
+    Cached captures come back as a SimpleNamespace with the same attributes.
+    """
+    if use_cache:
+        hit = cache_get(key, CACHE_TTL)
+        if hit is not None:
+            return SimpleNamespace(**hit)
+    item = fetch()
+    if use_cache:
+        fields: Dict[str, Any] = {f: getattr(item, f) for f in _CAPTURE_FIELDS if hasattr(item, f)}
+        cache_set(key, fields)
+    return item
+
+
+def read_batch(stream: Any) -> List[str]:
+    """One URL per line; blank lines and '#' comments are skipped."""
+    out: List[str] = []
+    for line in stream:
+        v = line.strip()
+        if v and not v.startswith("#"):
+            out.append(v)
+    return out
 
 
 def print_capture(item) -> None:
@@ -52,50 +150,52 @@ def print_capture(item) -> None:
     item: waybackpy snapshot/capture object (CDX result)
     Fields shown in docs: archive_url, original, timestamp, datetime_timestamp, statuscode, mimetype, urlkey
     """
-    print(f"archive_url : {getattr(item, 'archive_url', None)}")
-    print(f"original    : {getattr(item, 'original', None)}")
-    print(f"timestamp   : {getattr(item, 'timestamp', None)}")
-    print(f"datetime    : {getattr(item, 'datetime_timestamp', None)}")
-    print(f"statuscode  : {getattr(item, 'statuscode', None)}")
-    print(f"mimetype    : {getattr(item, 'mimetype', None)}")
+    try:
+        au, orig, ts, dt, sc, mt = _CAPTURE_GETTER(item)
+    except AttributeError:
+        # not a full CDXSnapshot: show what is there
+        au, orig, ts, dt, sc, mt = (getattr(item, f, None) for f in _CAPTURE_FIELDS[:-1])
+    out = (
+        f"archive_url : {au}\n"
+        f"original    : {orig}\n"
+        f"timestamp   : {ts}\n"
+        f"datetime    : {dt}\n"
+        f"statuscode  : {sc}\n"
+        f"mimetype    : {mt}\n"
+    )
     # urlkey is sometimes helpful for debugging
-    if hasattr(item, "urlkey"):
-        print(f"urlkey      : {getattr(item, 'urlkey', None)}")
+    try:
+        out += f"urlkey      : {item.urlkey}\n"
+    except AttributeError:
+        pass
+    sys.stdout.write(out)
 
 
-def mode_newest(url: str) -> int:
-    cdx = WaybackMachineCDXServerAPI(url, get_default_user_agent())
-    item = cdx.newest()
+def mode_newest(url: str, use_cache: bool = True) -> int:
+    item = _cached_capture(f"newest:{url}", use_cache, lambda: _cdx(url, DEFAULT_UA).newest())
     print("== newest ==")
     print_capture(item)
     return 0
 
 
-def mode_oldest(url: str) -> int:
-    cdx = WaybackMachineCDXServerAPI(url, get_default_user_agent())
-    item = cdx.oldest()
+def mode_oldest(url: str, use_cache: bool = True) -> int:
+    item = _cached_capture(f"oldest:{url}", use_cache, lambda: _cdx(url, DEFAULT_UA).oldest())
     print("== oldest ==")
     print_capture(item)
     return 0
 
 
-def mode_near(url: str, year: Optional[int], month: Optional[int], day: Optional[int],
+def _near_one(url: str, year: Optional[int], month: Optional[int], day: Optional[int],
               hour: Optional[int], minute: Optional[int],
-              wayback_ts: Optional[str], unix_ts: Optional[int]) -> int:
-    cdx = WaybackMachineCDXServerAPI(url, get_default_user_agent())
+              wayback_ts: Optional[str], unix_ts: Optional[int]) -> Tuple[str, Any]:
+    """Returns (query description, capture); prints nothing so batch workers can use it."""
+    cdx = _cdx(url, DEFAULT_UA)
 
-    print("== near ==")
     if wayback_ts:
-        item = cdx.near(wayback_machine_timestamp=wayback_ts)
-        print(f"query: wayback_machine_timestamp={wayback_ts}")
-        print_capture(item)
-        return 0
+        return f"wayback_machine_timestamp={wayback_ts}", cdx.near(wayback_machine_timestamp=wayback_ts)
 
     if unix_ts is not None:
-        item = cdx.near(unix_timestamp=unix_ts)
-        print(f"query: unix_timestamp={unix_ts}")
-        print_capture(item)
-        return 0
+        return f"unix_timestamp={unix_ts}", cdx.near(unix_timestamp=unix_ts)
 
     # date components (defaults)
     y = year if year is not None else 2010
@@ -105,11 +205,50 @@ def mode_near(url: str, year: Optional[int], month: Optional[int], day: Optional
     mi = minute if minute is not None else 0
 
     item = cdx.near(year=y, month=m, day=d, hour=h, minute=mi)
-    print(f"query: {y:04d}-{m:02d}-{d:02d} {h:02d}:{mi:02d}")
+    return f"{y:04d}-{m:02d}-{d:02d} {h:02d}:{mi:02d}", item
+
+
+def mode_near(url: str, year: Optional[int], month: Optional[int], day: Optional[int],
+              hour: Optional[int], minute: Optional[int],
+              wayback_ts: Optional[str], unix_ts: Optional[int]) -> int:
+    print("== near ==")
+    query, item = _near_one(url, year, month, day, hour, minute, wayback_ts, unix_ts)
+    print(f"query: {query}")
     print_capture(item)
     return 0
 
 
+def mode_near_batch(urls: List[str], year: Optional[int], month: Optional[int], day: Optional[int],
+                    hour: Optional[int], minute: Optional[int],
+                    wayback_ts: Optional[str], unix_ts: Optional[int], workers: int = 8) -> int:
+    """
+    near for many URLs: CDX lookups run concurrently (one _cdx client per URL),
+    results are printed in input order. A failed URL is reported and skipped.
+    """
+    def one(u: str) -> Tuple[str, Optional[Tuple[str, Any]], Optional[str]]:
+        try:
+            return u, _near_one(u, year, month, day, hour, minute, wayback_ts, unix_ts), None
+        except Exception as e:
+            return u, None, str(e)
+
+    rc = 0
+    shown = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for u, res, err in pool.map(one, urls):
+            if err is not None:
+                print(f"error: waybackpy_failed: {u}: {err}", file=sys.stderr)
+                rc = 1
+                continue
+            query, item = res
+            if shown:
+                print()
+            print(f"== near == {u}")
+            print(f"query: {query}")
+            print_capture(item)
+            shown += 1
+    return rc
+
+
 def mode_snapshots(url: str, start: Optional[int], end: Optional[int], limit: int) -> int:
     """
     start/end:
@@ -122,7 +261,10 @@ def mode_snapshots(url: str, start: Optional[int], end: Optional[int], limit: in
     if end is not None:
         cdx_kwargs["end_timestamp"] = end
 
-    cdx = WaybackMachineCDXServerAPI(url, get_default_user_agent(), **cdx_kwargs)
+    from waybackpy import WaybackMachineCDXServerAPI
+
+    # fresh client, not _cdx(): a cached one may carry near()'s sort/limit=1
+    cdx = WaybackMachineCDXServerAPI(url, DEFAULT_UA, **cdx_kwargs)
 
     print("== snapshots ==")
     if start is not None or end is not None:
@@ -130,14 +272,17 @@ def mode_snapshots(url: str, start: Optional[int], end: Optional[int], limit: in
     print(f"limit: {limit}")
 
     n = 0
-    for item in cdx.snapshots():
-        n += 1
+    lines: List[str] = []
+    for n, item in enumerate(islice(cdx.snapshots(), max(0, limit)), 1):
         ts = getattr(item, "timestamp", "")
         sc = getattr(item, "statuscode", "")
         au = getattr(item, "archive_url", "")
-        print(f"{n:04d}  {ts}  {sc}  {au}")
-        if n >= limit:
-            break
+        lines.append(f"{n:04d}  {ts}  {sc}  {au}\n")
+        if len(lines) >= _WRITE_CHUNK:
+            sys.stdout.write("".join(lines))
+            lines.clear()
+    if lines:
+        sys.stdout.write("".join(lines))
 
     if n == 0:
         print("(no snapshots found)")
@@ -145,7 +290,9 @@ def mode_snapshots(url: str, start: Optional[int], end: Optional[int], limit: in
 
 
 def mode_save(url: str) -> int:
-    save_api = WaybackMachineSaveAPI(url, get_default_user_agent())
+    from waybackpy import WaybackMachineSaveAPI
+
+    save_api = WaybackMachineSaveAPI(url, DEFAULT_UA)
     saved_url = save_api.save()
     print("== save ==")
     print(f"saved_url   : {saved_url}")
@@ -160,9 +307,10 @@ def mode_save(url: str) -> int:
     return 0
 
 
-def parse_args() -> argparse.Namespace:
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Wayback Machine lookup via waybackpy")
-    p.add_argument("url", help="Target URL (http/https)")
+    p.add_argument("url", nargs="?", help="Target URL (http/https)")
     p.add_argument("--mode", choices=["newest", "oldest", "near", "snapshots", "save"], default="newest")
 
     # near options
@@ -179,12 +327,48 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--end", type=int, help="End timestamp/year (e.g., 2019 or 20191231235959)")
     p.add_argument("--limit", type=int, default=50, help="Max snapshots to print (default: 50)")
 
-    return p.parse_args()
+    p.add_argument("--no-cache", action="store_true", help="Always query the Wayback Machine (newest/oldest are cached 24h)")
+
+    # batch (near only)
+    p.add_argument("--batch", action="store_true", help="--mode near for URLs read from stdin (one per line)")
+    p.add_argument("--workers", type=int, default=8, help="Concurrent lookups in --batch mode (default: 8)")
+
+    return p
+
+
+def parse_args() -> argparse.Namespace:
+    return _build_parser().parse_args()
 
 
 def main() -> int:
     args = parse_args()
 
+    if args.batch:
+        if args.mode != "near":
+            _build_parser().error("--batch is only supported with --mode near")
+        urls = []
+        rc = 0
+        for raw in read_batch(sys.stdin):
+            try:
+                urls.append(validate_url(raw))
+            except ValueError as e:
+                print(f"error: {e}: {raw}", file=sys.stderr)
+                rc = 2
+        if not urls:
+            return rc
+        rc_batch = mode_near_batch(
+            urls,
+            year=args.year, month=args.month, day=args.day,
+            hour=args.hour, minute=args.minute,
+            wayback_ts=args.wayback_ts,
+            unix_ts=args.unix_ts,
+            workers=args.workers,
+        )
+        return max(rc, rc_batch)
+
+    if args.url is None:
+        _build_parser().error("url is required (or use --batch with --mode near)")
+
     try:
         url = validate_url(args.url)
     except ValueError as e:
@@ -193,9 +377,9 @@ def main() -> int:
 
     try:
         if args.mode == "newest":
-            return mode_newest(url)
+            return mode_newest(url, use_cache=not args.no_cache)
         if args.mode == "oldest":
-            return mode_oldest(url)
+            return mode_oldest(url, use_cache=not args.no_cache)
         if args.mode == "near":
             return mode_near(
                 url,
@@ -219,4 +403,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())